@@ -0,0 +1,157 @@
+"""
+InnerTube Module
+Resolves direct download URLs from YouTube's /youtubei/v1/player endpoint without yt-dlp
+"""
+
+import http.client
+import json
+import urllib.request
+from typing import Optional, Dict, Tuple
+
+
+PLAYER_ENDPOINT = "https://www.youtube.com/youtubei/v1/player?prettyPrint=false"
+
+# Seconds before a player request is abandoned (and left to yt-dlp)
+REQUEST_TIMEOUT = 15
+
+# The ANDROID client receives plain (unciphered) stream URLs, so there is
+# no player JS to download or signature to decrypt
+CLIENT_VERSION = "19.09.37"
+CLIENT_CONTEXT = {
+    'client': {
+        'clientName': 'ANDROID',
+        'clientVersion': CLIENT_VERSION,
+        'androidSdkVersion': 30,
+        'hl': 'en',
+        'gl': 'US',
+    }
+}
+REQUEST_HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': f"com.google.android.youtube/{CLIENT_VERSION} (Linux; U; Android 11) gzip",
+    'X-YouTube-Client-Name': '3',
+    'X-YouTube-Client-Version': CLIENT_VERSION,
+}
+
+# Maximum video height per quality preference (None = no limit)
+QUALITY_HEIGHTS = {
+    '1080p': 1080,
+    '720p': 720,
+    'best': None
+}
+
+
+def build_player_request(video_id: str) -> Dict:
+    """Build the JSON body for a player request."""
+    return {'context': CLIENT_CONTEXT, 'videoId': video_id}
+
+
+def _select_format(streaming_data: Dict, quality_preference: str) -> Optional[Dict]:
+    """
+    Pick the stream matching the quality preference from InnerTube streamingData.
+
+    Mirrors the yt-dlp format selectors: an mp4 video stream within the
+    height limit, then a muxed mp4, then any muxed stream.
+    """
+    max_height = QUALITY_HEIGHTS.get(quality_preference)
+
+    def fits(fmt: Dict) -> bool:
+        return bool(fmt.get('url')) and (max_height is None or fmt.get('height', 0) <= max_height)
+
+    adaptive = streaming_data.get('adaptiveFormats', [])
+    muxed = streaming_data.get('formats', [])
+
+    candidates = (
+        [f for f in adaptive if f.get('mimeType', '').startswith('video/mp4') and fits(f)]
+        or [f for f in muxed if f.get('mimeType', '').startswith('video/mp4') and fits(f)]
+        or [f for f in muxed if f.get('url')]
+    )
+
+    if not candidates:
+        return None
+
+    return max(candidates, key=lambda f: (f.get('height', 0), f.get('bitrate', 0)))
+
+
+def _build_format_info(fmt: Dict) -> Dict:
+    """Build a format_info dict in the same shape as url_resolver.get_direct_url"""
+    mime_type = fmt.get('mimeType', 'video/mp4')
+    codecs = mime_type.partition('codecs="')[2].rstrip('"').split(', ')
+
+    return {
+        'resolution': f"{fmt.get('width', 'N/A')}x{fmt.get('height', 'N/A')}",
+        'filesize': int(fmt.get('contentLength', 0)),
+        'ext': mime_type.split(';')[0].split('/')[-1],
+        'format_note': fmt.get('qualityLabel', 'unknown'),
+        'vcodec': codecs[0] or 'unknown',
+        'acodec': codecs[1] if len(codecs) > 1 else 'none'
+    }
+
+
+def parse_player_response(
+    data: Dict,
+    quality_preference: str = 'best'
+) -> Tuple[Optional[str], Optional[Dict], Optional[str]]:
+    """
+    Extract the direct URL for the preferred quality from a player response.
+
+    Args:
+        data: Decoded JSON returned by the player endpoint
+        quality_preference: Quality preference ('1080p', '720p', 'best')
+
+    Returns:
+        Tuple of (direct_url, format_info, error_class), as returned by
+        url_resolver.get_direct_url
+    """
+    if not isinstance(data, dict):
+        # Valid JSON but not a player response (e.g. an error page body)
+        return None, None, 'transient'
+
+    status = data.get('playabilityStatus', {}).get('status')
+    if status != 'OK':
+        # ERROR / UNPLAYABLE mean the video itself is gone or blocked
+        return None, None, 'permanent' if status in ('ERROR', 'UNPLAYABLE') else 'transient'
+
+    fmt = _select_format(data.get('streamingData', {}), quality_preference)
+    if not fmt:
+        return None, None, 'permanent'
+
+    return fmt['url'], _build_format_info(fmt), None
+
+
+def resolve(
+    video_id: str,
+    quality_preference: str = 'best',
+    timeout: float = REQUEST_TIMEOUT
+) -> Tuple[Optional[str], Optional[Dict], Optional[str]]:
+    """
+    Resolve direct download URL for a YouTube video with a single player request.
+
+    Drop-in alternative to url_resolver.get_direct_url. Videos InnerTube
+    won't serve directly (ciphered, login required) fail and should be
+    retried through yt-dlp.
+
+    Args:
+        video_id: YouTube video ID
+        quality_preference: Quality preference ('1080p', '720p', 'best')
+        timeout: Request timeout in seconds
+
+    Returns:
+        Tuple of (direct_url, format_info, error_class)
+    """
+    request = urllib.request.Request(
+        PLAYER_ENDPOINT,
+        data=json.dumps(build_player_request(video_id)).encode('utf-8'),
+        headers=REQUEST_HEADERS,
+        method='POST'
+    )
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            data = json.load(response)
+    except (OSError, http.client.HTTPException, ValueError):
+        # URLError, timeouts and resets while reading the body are all OSErrors;
+        # IncompleteRead is an HTTPException. Any of them means "try yt-dlp"
+        return None, None, 'transient'
+
+    return parse_player_response(data, quality_preference)
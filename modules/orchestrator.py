@@ -1,19 +1,111 @@
 """
 Orchestrator Module
-Coordinates the workflow of fetching playlists, resolving URLs, and generating output
+Coordinates the workflow of fetching playlists, resolving URLs, and generating output.
+Runs sequentially with max_workers=1 and concurrently (async mode) otherwise.
 """
 
+import multiprocessing
+import os
 import time
 from typing import List, Dict, Optional
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
-from rich.console import Console
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
-from modules.playlist_fetcher import get_playlist_videos, get_playlist_title
+from modules.playlist_fetcher import get_playlist_info
 from modules.url_resolver import get_direct_url, format_filesize
-from modules.output_formatter import write_to_file, generate_output_filename
+from modules import innertube
+from modules.output_formatter import OutputWriter, generate_output_filename
+from modules.rate_limiter import TokenBucket
 
+# Rich (console output) and aiohttp (InnerTube pass) are imported inside
+# process_playlist so worker processes and other importers don't pay for them
 
-console = Console()
+# Minimum seconds between progress bar updates (caps updates at 10Hz)
+PROGRESS_UPDATE_INTERVAL = 0.1
+
+
+def _resolve_video_url(
+    idx: int,
+    video: Dict,
+    quality: str,
+    max_retries: int,
+    bucket: Optional[TokenBucket] = None,
+    use_innertube: bool = False
+) -> Dict:
+    """
+    Helper function to resolve URL for a single video (also used in thread pool).
+    
+    Args:
+        idx: Position of the video in the playlist (carried through to the result)
+        video: Video metadata dictionary
+        quality: Quality preference
+        max_retries: Maximum retry attempts
+        bucket: Rate limiter shared by all workers
+        use_innertube: Try a direct InnerTube player request before yt-dlp
+        
+    Returns:
+        Dictionary with video data or None if failed
+    """
+    video_id = video['id']
+    video_title = video['title']
+    
+    # Videos resolved by the concurrent InnerTube pass need no further work
+    direct_url = video.get('direct_url')
+    format_info = video.get('format_info')
+    
+    if not direct_url and use_innertube:
+        # One player request with no JS parsing; yt-dlp only handles the misses
+        if bucket:
+            bucket.acquire()
+        
+        direct_url, format_info, _ = innertube.resolve(video_id, quality)
+    
+    # Attempt to resolve URL with retries
+    for attempt in range(0 if direct_url else max_retries):
+        if bucket:
+            bucket.acquire()
+        
+        direct_url, format_info, error_class = get_direct_url(video_id, quality)
+        
+        # Private/deleted/age-restricted videos will never succeed on retry
+        if direct_url or error_class == 'permanent':
+            break
+        
+        if attempt < max_retries - 1:
+            # Exponential backoff for transient failures (rate limiting, network)
+            time.sleep(0.5 * 2 ** attempt)
+    
+    if direct_url:
+        # Add filesize string to format_info
+        if format_info:
+            format_info['filesize_str'] = format_filesize(format_info.get('filesize', 0))
+        
+        return {
+            'idx': idx,
+            'title': video_title,
+            'url': direct_url,
+            'format_info': format_info,
+            'success': True
+        }
+    else:
+        return {
+            'idx': idx,
+            'title': video_title,
+            'success': False
+        }
+
+
+def _record_result(video_result: Dict, writer: OutputWriter, result: Dict, failed_videos: List[str]) -> None:
+    """Write a resolved video to the output file, or record it as failed."""
+    if video_result['success']:
+        writer.write_video({
+            'title': video_result['title'],
+            'url': video_result['url'],
+            'format_info': video_result['format_info']
+        })
+        result['successful'] += 1
+    else:
+        failed_videos.append(video_result['title'])
+        result['failed'] += 1
 
 
 def process_playlist(
@@ -21,7 +113,11 @@ def process_playlist(
     output_path: Optional[str] = None,
     quality: str = 'best',
     delay: float = 1.5,
-    max_retries: int = 3
+    max_retries: int = 3,
+    max_workers: int = 10,
+    use_innertube: bool = False,
+    use_processes: bool = False,
+    playlist_id: Optional[str] = None
 ) -> Dict[str, any]:
     """
     Main orchestration function to process a YouTube playlist.
@@ -30,8 +126,18 @@ def process_playlist(
         playlist_url: URL of the YouTube playlist
         output_path: Path to output file (auto-generated if None)
         quality: Quality preference ('1080p', '720p', 'best')
-        delay: Delay between requests in seconds
+        delay: Per-worker delay between requests in seconds; workers share a token
+               bucket refilling at max_workers / delay requests per second
         max_retries: Maximum retry attempts for failed videos
+        max_workers: Number of concurrent workers (default: 10, max recommended: 20).
+                     1 processes videos sequentially without a thread pool.
+        use_innertube: Resolve URLs through the InnerTube player API first (one aiohttp
+                       pass in concurrent mode, inline requests in sequential mode);
+                       videos it can't serve fall back to yt-dlp
+        use_processes: Resolve videos in worker processes instead of threads, so
+                       yt-dlp's CPU-bound JS/JSON parsing runs on every core.
+                       Workers share only the on-disk caches.
+        playlist_id: Playlist ID already parsed from playlist_url, if known
         
     Returns:
         Dictionary containing:
@@ -51,19 +157,36 @@ def process_playlist(
         'errors': []
     }
     
-    console.print("\n[bold cyan]YouTube Playlist Direct Link Extractor[/bold cyan]")
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+    from rich.console import Console
+    
+    console = Console()
+    
+    concurrent = max_workers > 1
+    
+    mode_label = " (ASYNC MODE)" if concurrent else ""
+    console.print(f"\n[bold cyan]YouTube Playlist Direct Link Extractor{mode_label}[/bold cyan]")
     console.print("=" * 60)
     
     # Step 1: Fetch playlist metadata
     console.print("\n[yellow]Step 1:[/yellow] Fetching playlist metadata...")
     
     try:
-        playlist_title = get_playlist_title(playlist_url)
-        videos = get_playlist_videos(playlist_url)
-        result['total_videos'] = len(videos)
+        # Videos are streamed from the playlist as its pages load, so URL
+        # resolution starts before the whole playlist has been fetched
+        playlist_info = get_playlist_info(playlist_url, lazy=True, playlist_id=playlist_id)
+        playlist_title = playlist_info['title']
+        expected_videos = playlist_info['count']
+        videos = playlist_info['videos']
+        
+        # The concurrent InnerTube pass below batches every video at once
+        if use_innertube and concurrent:
+            videos = list(videos)
+            expected_videos = len(videos)
         
         console.print(f"[green]✓[/green] Found playlist: [bold]{playlist_title}[/bold]")
-        console.print(f"[green]✓[/green] Total videos: [bold]{len(videos)}[/bold]")
+        if expected_videos is not None:
+            console.print(f"[green]✓[/green] Total videos: [bold]{expected_videos}[/bold]")
         
     except Exception as e:
         error_msg = f"Failed to fetch playlist: {str(e)}"
@@ -71,95 +194,174 @@ def process_playlist(
         console.print(f"[red]✗[/red] {error_msg}")
         return result
     
-    if not videos:
-        error_msg = "No videos found in playlist"
+    # Generate output filename if not provided
+    if not output_path:
+        output_path = generate_output_filename(playlist_title)
+    
+    # Open the output file up front so each URL is written as soon as it resolves
+    try:
+        writer = OutputWriter(output_path, playlist_title, expected_videos)
+    except Exception as e:
+        error_msg = f"Failed to write output file: {str(e)}"
         result['errors'].append(error_msg)
         console.print(f"[red]✗[/red] {error_msg}")
         return result
     
     # Step 2: Resolve direct URLs
     console.print(f"\n[yellow]Step 2:[/yellow] Resolving direct URLs (quality: {quality})...")
-    console.print(f"[dim]Rate limiting: {delay}s delay between requests[/dim]\n")
+    if concurrent:
+        console.print(f"[bold green]⚡ CONCURRENT MODE:[/bold green] Processing {max_workers} videos at a time")
+        if expected_videos:
+            console.print(f"[dim]Expected speedup: {min(max_workers, expected_videos)}x faster than sequential[/dim]\n")
+    else:
+        console.print(f"[dim]Rate limiting: {delay}s delay between requests[/dim]\n")
     
-    video_data = []
     failed_videos = []
     
-    with Progress(
+    with writer, Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         BarColumn(),
         TaskProgressColumn(),
-        console=console
+        console=console,
+        refresh_per_second=10
     ) as progress:
         
-        task = progress.add_task("[cyan]Processing videos...", total=len(videos))
+        task_description = "[cyan]Processing videos concurrently..." if concurrent else "[cyan]Processing videos..."
+        task = progress.add_task(task_description, total=expected_videos)
         
-        for idx, video in enumerate(videos, 1):
-            video_id = video['id']
-            video_title = video['title']
-            
-            progress.update(task, description=f"[cyan]Processing: {video_title[:40]}...")
-            
-            # Attempt to resolve URL with retries
-            direct_url = None
-            format_info = None
+        if use_innertube and concurrent:
+            import asyncio
+            from modules.url_resolver_async import get_direct_urls_async
             
-            for attempt in range(max_retries):
-                direct_url, format_info = get_direct_url(video_id, quality)
-                
+            # One event loop drives every InnerTube request; hits are marked
+            # as resolved so the thread pool below only handles the misses
+            progress.update(task, description="[cyan]Querying InnerTube player API...")
+            resolved = asyncio.run(get_direct_urls_async(
+                [video['id'] for video in videos], quality, max_workers
+            ))
+            for video, (direct_url, format_info, _) in zip(videos, resolved):
                 if direct_url:
-                    break
+                    video['direct_url'] = direct_url
+                    video['format_info'] = format_info
+            progress.update(task, description=task_description)
+        
+        # Each worker thread resolves through its own YoutubeDL instance, and
+        # all workers draw from one token bucket refilling at max_workers / delay
+        bucket = TokenBucket(rate=max_workers / delay, capacity=max_workers) if delay > 0 else None
+        
+        executor = None
+        
+        # Results arrive in completion order; each is held here until every
+        # earlier video is done, so the output file follows playlist order
+        pending_results = {}
+        next_idx = 0
+        
+        try:
+            if concurrent:
+                if use_processes:
+                    # Each process builds its own YoutubeDL; the token bucket can't be
+                    # shared across processes, so submissions are paced here instead.
+                    # Spawned (not forked) so workers never inherit this process's
+                    # YoutubeDL connections or SQLite handle from the warm-up video
+                    executor = ProcessPoolExecutor(
+                        max_workers=max_workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                else:
+                    # Use ThreadPoolExecutor for concurrent processing
+                    executor = ThreadPoolExecutor(max_workers=max_workers)
+                futures = []
                 
-                if attempt < max_retries - 1:
-                    time.sleep(delay * 0.5)  # Shorter delay for retries
-            
-            if direct_url:
-                # Add filesize string to format_info
-                if format_info:
-                    format_info['filesize_str'] = format_filesize(format_info.get('filesize', 0))
+                try:
+                    # Submit each video as soon as the playlist yields it
+                    for idx, video in enumerate(videos):
+                        if futures and use_processes:
+                            if bucket:
+                                bucket.acquire()
+                            futures.append(executor.submit(
+                                _resolve_video_url, idx, video, quality, max_retries
+                            ))
+                        elif futures:
+                            futures.append(executor.submit(
+                                _resolve_video_url, idx, video, quality, max_retries, bucket
+                            ))
+                        else:
+                            # Resolve the first video before fanning out so the player JS is
+                            # downloaded and cached once instead of by every worker at once
+                            warmup = Future()
+                            warmup.set_result(_resolve_video_url(idx, video, quality, max_retries, bucket))
+                            futures.append(warmup)
+                except Exception as e:
+                    # Keep whatever was discovered before the playlist failed
+                    error_msg = str(e)
+                    result['errors'].append(error_msg)
+                    console.print(f"[red]✗[/red] {error_msg}")
+                
+                progress.update(task, total=len(futures))
                 
-                video_data.append({
-                    'title': video_title,
-                    'url': direct_url,
-                    'format_info': format_info
-                })
-                result['successful'] += 1
+                # Process results as they complete
+                results = (future.result() for future in as_completed(futures))
             else:
-                failed_videos.append(video_title)
-                result['failed'] += 1
-                console.print(f"[red]✗[/red] Failed: {video_title}")
+                # Sequential mode: resolve one video at a time on this thread
+                results = (
+                    _resolve_video_url(idx, video, quality, max_retries, bucket, use_innertube)
+                    for idx, video in enumerate(videos)
+                )
+            
+            # Coalesce progress advances so bursts of completions don't each
+            # contend for the Rich render lock
+            pending_advance = 0
+            last_update = time.monotonic()
+            processed = 0
+            
+            for video_result in results:
+                pending_results[video_result['idx']] = video_result
+                while next_idx in pending_results:
+                    _record_result(pending_results.pop(next_idx), writer, result, failed_videos)
+                    next_idx += 1
+                
+                processed += 1
+                pending_advance += 1
+                now = time.monotonic()
+                if now - last_update >= PROGRESS_UPDATE_INTERVAL:
+                    progress.update(task, advance=pending_advance)
+                    pending_advance = 0
+                    last_update = now
             
-            progress.update(task, advance=1)
+            # The playlist size is only final once every video has been seen
+            progress.update(task, total=processed, completed=processed)
+        
+        except Exception as e:
+            # Sequential mode reads the playlist while resolving
+            error_msg = str(e)
+            result['errors'].append(error_msg)
+            console.print(f"[red]✗[/red] {error_msg}")
+        
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
             
-            # Rate limiting delay (except for last video)
-            if idx < len(videos):
-                time.sleep(delay)
+            # Keep results still waiting on an earlier video if the run was cut short
+            for idx in sorted(pending_results):
+                _record_result(pending_results[idx], writer, result, failed_videos)
     
-    # Step 3: Write output file
-    console.print(f"\n[yellow]Step 3:[/yellow] Writing output file...")
+    result['total_videos'] = result['successful'] + result['failed']
     
-    if not video_data:
-        error_msg = "No URLs were successfully resolved"
+    # Step 3: Finalize output file
+    console.print(f"\n[yellow]Step 3:[/yellow] Finalizing output file...")
+    
+    if not writer.count:
+        os.remove(output_path)
+        error_msg = "No URLs were successfully resolved" if result['total_videos'] else "No videos found in playlist"
         result['errors'].append(error_msg)
         console.print(f"[red]✗[/red] {error_msg}")
         return result
     
-    # Generate output filename if not provided
-    if not output_path:
-        output_path = generate_output_filename(playlist_title)
+    result['output_file'] = output_path
+    result['success'] = True
     
-    try:
-        url_count = write_to_file(video_data, output_path, playlist_title)
-        result['output_file'] = output_path
-        result['success'] = True
-        
-        console.print(f"[green]✓[/green] Successfully wrote {url_count} URLs to: [bold]{output_path}[/bold]")
-        
-    except Exception as e:
-        error_msg = f"Failed to write output file: {str(e)}"
-        result['errors'].append(error_msg)
-        console.print(f"[red]✗[/red] {error_msg}")
-        return result
+    console.print(f"[green]✓[/green] Successfully wrote {writer.count} URLs to: [bold]{output_path}[/bold]")
     
     # Summary
     console.print("\n" + "=" * 60)
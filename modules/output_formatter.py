@@ -4,79 +4,138 @@ Formats and writes video URLs to IDM-compatible text files
 """
 
 from datetime import datetime
-from typing import List, Dict
+from typing import Dict, Optional
 import os
 
 
-def write_to_file(video_data: List[Dict], output_path: str, playlist_title: str = "Unknown Playlist") -> int:
+# Translation table replacing characters invalid in filenames on any OS
+_INVALID_TABLE = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
+# Output file write buffer size
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Number of video entries collected before they are handed to writelines()
+_FLUSH_EVERY = 1000
+
+# Horizontal rule and file header, built once at import time
+_HR = "=" * 80 + "\n"
+_HEADER_TEMPLATE = (
+    f"{_HR}YouTube Playlist Direct Download URLs\n{_HR}"
+    + "Playlist: {title}\nGenerated: {ts}\nTotal Videos: {n}\n"
+    + f"{_HR}\n"
+    + "IMPORTANT NOTES:\n"
+    + "- These URLs expire after several hours. Use them promptly.\n"
+    + "- Import this file into Internet Download Manager (IDM) for batch downloading.\n"
+    + "- Each URL is preceded by the video title as a comment.\n"
+    + f"\n{_HR}\n"
+)
+
+
+class OutputWriter:
     """
-    Write video URLs to a formatted text file compatible with IDM.
+    Write video URLs incrementally to a formatted text file compatible with IDM.
     
-    Args:
-        video_data: List of dictionaries containing video info:
-                   - title: Video title
-                   - url: Direct download URL
-                   - format_info: Optional format details
-        output_path: Path to output file
-        playlist_title: Title of the playlist
-        
-    Returns:
-        Number of URLs written to file
+    The header is written as soon as the writer is created and every video is
+    appended the moment it is resolved, so an interrupted run keeps all URLs
+    written so far.
+    
+    Usage:
+        with OutputWriter(output_path, playlist_title, total_videos) as writer:
+            writer.write_video({'title': ..., 'url': ..., 'format_info': ...})
     """
-    # Ensure output directory exists
-    output_dir = os.path.dirname(output_path)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
     
-    # Generate timestamp
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def __init__(self, output_path: str, playlist_title: str = "Unknown Playlist", total_videos: Optional[int] = None):
+        """
+        Open the output file and write the header.
+        
+        Args:
+            output_path: Path to output file
+            playlist_title: Title of the playlist
+            total_videos: Number of videos in the playlist (None if unknown)
+            
+        Raises:
+            OSError: If the output file cannot be created
+        """
+        self.output_path = output_path
+        self.count = 0
+        self._lines = []
+        
+        # Ensure output directory exists
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        
+        # Generate timestamp
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # 1MB buffer keeps write() syscalls rare on large playlists; the buffer
+        # is flushed on close, including when the run is interrupted
+        self._file = open(output_path, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE)
+        
+        # Write header and important notes
+        self._file.write(_HEADER_TEMPLATE.format(
+            title=playlist_title,
+            ts=timestamp,
+            n=total_videos if total_videos is not None else 'Unknown'
+        ))
+    
+    def __enter__(self) -> 'OutputWriter':
+        return self
     
-    # Count successful URLs
-    url_count = len([v for v in video_data if v.get('url')])
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        # Write header
-        f.write("=" * 80 + "\n")
-        f.write(f"YouTube Playlist Direct Download URLs\n")
-        f.write("=" * 80 + "\n")
-        f.write(f"Playlist: {playlist_title}\n")
-        f.write(f"Generated: {timestamp}\n")
-        f.write(f"Total Videos: {url_count}\n")
-        f.write("=" * 80 + "\n")
-        f.write("\n")
+    def write_video(self, video: Dict) -> bool:
+        """
+        Append a single video entry to the file.
         
-        # Write important notes
-        f.write("IMPORTANT NOTES:\n")
-        f.write("- These URLs expire after several hours. Use them promptly.\n")
-        f.write("- Import this file into Internet Download Manager (IDM) for batch downloading.\n")
-        f.write("- Each URL is preceded by the video title as a comment.\n")
-        f.write("\n")
-        f.write("=" * 80 + "\n")
-        f.write("\n")
+        Args:
+            video: Dictionary containing video info:
+                   - title: Video title
+                   - url: Direct download URL
+                   - format_info: Optional format details
+                   
+        Returns:
+            True if the entry was written, False if it has no URL
+        """
+        url = video.get('url')
+        if not url:
+            return False
         
-        # Write video URLs
-        for idx, video in enumerate(video_data, 1):
-            url = video.get('url')
-            if not url:
-                continue
-                
-            title = video.get('title', 'Unknown Title')
-            format_info = video.get('format_info', {})
-            
-            # Write video title as comment
-            f.write(f"# Video {idx}: {title}\n")
-            
-            # Write format info if available
-            if format_info:
-                resolution = format_info.get('resolution', 'N/A')
-                filesize = format_info.get('filesize_str', 'Unknown')
-                f.write(f"# Resolution: {resolution} | Size: {filesize}\n")
-            
-            # Write direct URL
-            f.write(f"{url}\n")
-            f.write("\n")
+        self.count += 1
+        lines = self._lines
+        
+        title = video.get('title', 'Unknown Title')
+        format_info = video.get('format_info', {})
+        
+        # Video title as comment
+        lines.append(f"# Video {self.count}: {title}\n")
+        
+        # Format info if available
+        if format_info:
+            resolution = format_info.get('resolution', 'N/A')
+            filesize = format_info.get('filesize_str', 'Unknown')
+            lines.append(f"# Resolution: {resolution} | Size: {filesize}\n")
+        
+        # Direct URL
+        lines.append(f"{url}\n\n")
+        
+        if self.count % _FLUSH_EVERY == 0:
+            self.flush()
+        
+        return True
+    
+    def flush(self) -> None:
+        """Hand all collected entries to the file in a single writelines() call."""
+        if self._lines:
+            self._file.writelines(self._lines)
+            self._lines.clear()
     
-    return url_count
+    def close(self) -> None:
+        """Flush and close the output file."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
 
 
 def sanitize_filename(filename: str) -> str:
@@ -89,17 +148,9 @@ def sanitize_filename(filename: str) -> str:
     Returns:
         Sanitized filename safe for all operating systems
     """
-    # Remove or replace invalid characters
-    invalid_chars = '<>:"/\\|?*'
-    for char in invalid_chars:
-        filename = filename.replace(char, '_')
-    
-    # Remove leading/trailing spaces and dots
-    filename = filename.strip('. ')
-    
-    # Limit length
-    if len(filename) > 200:
-        filename = filename[:200]
+    # Replace invalid characters, remove leading/trailing spaces and dots,
+    # and limit length
+    filename = filename.translate(_INVALID_TABLE).strip('. ')[:200]
     
     return filename or "output"
 
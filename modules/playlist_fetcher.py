@@ -4,22 +4,79 @@ Extracts video metadata from YouTube playlists using yt-dlp
 """
 
 import yt_dlp
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, Iterator, Optional
+from urllib.parse import parse_qs, urlparse
 
 
-def get_playlist_videos(playlist_url: str) -> List[Dict[str, str]]:
+
+def _build_video_data(entry: Dict) -> Dict:
+    """Build a video metadata dictionary from a flat playlist entry."""
+    return {
+        'id': entry.get('id', ''),
+        'title': entry.get('title', 'Unknown Title'),
+        'url': entry.get('url', f"https://www.youtube.com/watch?v={entry.get('id', '')}"),
+        # Flat entries may carry no duration (or a float one)
+        'duration': int(entry.get('duration') or 0)
+    }
+
+
+def _is_watch_url(url: str) -> bool:
+    """Check whether a URL points at a video (watch?v= or youtu.be/<id>) rather than a playlist page."""
+    parsed = urlparse(url)
+    return 'v' in parse_qs(parsed.query) or parsed.netloc.endswith('youtu.be')
+
+
+def _iter_videos(ydl: yt_dlp.YoutubeDL, entries: Iterable[Dict]) -> Iterator[Dict]:
     """
-    Extract all video metadata from a YouTube playlist.
+    Yield video metadata as yt-dlp discovers playlist entries.
+    
+    Owns the YoutubeDL instance and closes it once the playlist is exhausted.
+    
+    Raises:
+        Exception: If a later playlist page cannot be fetched
+    """
+    try:
+        for entry in entries:
+            if entry is None:  # Skip unavailable videos
+                continue
+            yield _build_video_data(entry)
+    except Exception as e:
+        raise Exception(f"Failed to fetch playlist: {str(e)}")
+    finally:
+        ydl.close()
+
+
+def get_playlist_info(
+    playlist_url: str,
+    lazy: bool = False,
+    playlist_id: Optional[str] = None
+) -> Dict:
+    """
+    Extract the title and all video metadata from a YouTube playlist
+    in a single extraction.
     
     Args:
         playlist_url: Full URL of the YouTube playlist
+        lazy: Return videos as an iterator that fetches further playlist
+              pages on demand, so callers can start on the first videos
+              while the rest of the playlist is still loading.
+        playlist_id: Playlist ID already parsed from playlist_url. When given,
+                     the canonical playlist URL is sent straight to the
+                     YouTube playlist extractor, skipping URL matching.
+                     Ignored for watch URLs, which yt-dlp must see as-is.
         
     Returns:
-        List of dictionaries containing video metadata:
+        Dictionary containing:
+        - title: Playlist title
+        - count: Number of videos reported by YouTube (None if unknown)
+        - videos: List of dictionaries containing video metadata
+                  (an iterator when lazy is True)
+        
+        Each video dictionary contains:
         - id: Video ID
         - title: Video title
         - url: Full video URL
-        - duration: Video duration in seconds
+        - duration: Video duration in seconds (0 if YouTube did not list it)
         
     Raises:
         Exception: If playlist cannot be accessed or is invalid
@@ -27,16 +84,57 @@ def get_playlist_videos(playlist_url: str) -> List[Dict[str, str]]:
     ydl_opts = {
         'quiet': True,
         'no_warnings': True,
-        'extract_flat': True,  # Don't download, just get metadata
+        'extract_flat': 'in_playlist',  # Only read the playlist index, never the videos
+        'skip_download': True,
         'ignoreerrors': True,  # Skip unavailable videos
     }
     
+    # A known playlist ID goes straight to the playlist extractor. Watch URLs
+    # are kept as they are: Mix/radio lists (list=RD...) only extract from
+    # the watch page, not from /playlist
+    ie_key = None
+    if playlist_id and not _is_watch_url(playlist_url):
+        playlist_url = f"https://www.youtube.com/playlist?list={playlist_id}"
+        ie_key = 'YoutubeTab'
+    
+    if lazy:
+        ydl = yt_dlp.YoutubeDL(ydl_opts)
+        
+        try:
+            # Without processing, yt-dlp returns entries as a generator that
+            # fetches playlist pages only as they are consumed
+            playlist_info = ydl.extract_info(playlist_url, download=False, process=False, ie_key=ie_key)
+            
+            # Watch URLs with a list= parameter redirect to the playlist itself
+            if playlist_info and playlist_info.get('_type') in ('url', 'url_transparent'):
+                playlist_info = ydl.extract_info(
+                    playlist_info['url'], download=False, process=False,
+                    ie_key=playlist_info.get('ie_key')
+                )
+            
+            if not playlist_info:
+                raise Exception("Could not extract playlist information")
+            
+            # Check if it's actually a playlist
+            if 'entries' not in playlist_info:
+                raise Exception("URL does not appear to be a valid playlist")
+        
+        except Exception as e:
+            ydl.close()
+            raise Exception(f"Failed to fetch playlist: {str(e)}")
+        
+        return {
+            'title': playlist_info.get('title') or 'Unknown Playlist',
+            'count': playlist_info.get('playlist_count'),
+            'videos': _iter_videos(ydl, playlist_info['entries'])
+        }
+    
     videos = []
     
     try:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             # Extract playlist info
-            playlist_info = ydl.extract_info(playlist_url, download=False)
+            playlist_info = ydl.extract_info(playlist_url, download=False, ie_key=ie_key)
             
             if not playlist_info:
                 raise Exception("Could not extract playlist information")
@@ -49,41 +147,14 @@ def get_playlist_videos(playlist_url: str) -> List[Dict[str, str]]:
             for entry in playlist_info['entries']:
                 if entry is None:  # Skip unavailable videos
                     continue
-                    
-                video_data = {
-                    'id': entry.get('id', ''),
-                    'title': entry.get('title', 'Unknown Title'),
-                    'url': entry.get('url', f"https://www.youtube.com/watch?v={entry.get('id', '')}"),
-                    'duration': entry.get('duration', 0)
-                }
                 
-                videos.append(video_data)
+                videos.append(_build_video_data(entry))
     
     except Exception as e:
         raise Exception(f"Failed to fetch playlist: {str(e)}")
     
-    return videos
-
-
-def get_playlist_title(playlist_url: str) -> Optional[str]:
-    """
-    Get the title of a YouTube playlist.
-    
-    Args:
-        playlist_url: Full URL of the YouTube playlist
-        
-    Returns:
-        Playlist title or None if unavailable
-    """
-    ydl_opts = {
-        'quiet': True,
-        'no_warnings': True,
-        'extract_flat': True,
+    return {
+        'title': playlist_info.get('title') or 'Unknown Playlist',
+        'count': len(videos),
+        'videos': videos
     }
-    
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            playlist_info = ydl.extract_info(playlist_url, download=False)
-            return playlist_info.get('title', 'Unknown Playlist')
-    except:
-        return 'Unknown Playlist'
@@ -0,0 +1,42 @@
+"""
+Rate Limiter Module
+Token-bucket pacing for requests sent to YouTube
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Allows bursts of up to `capacity` requests and refills at `rate` tokens
+    per second, so callers only wait when the bucket is actually empty.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        Args:
+            rate: Tokens added per second (must be positive)
+            capacity: Maximum number of tokens held (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self) -> None:
+        """Take one token, blocking until one is available."""
+        with self._condition:
+            self._refill()
+            while self._tokens < 1:
+                self._condition.wait((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
@@ -0,0 +1,129 @@
+"""
+URL Cache Module
+Persistent SQLite cache of resolved direct URLs, keyed by (video_id, quality)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Tuple
+from urllib.parse import urlparse, parse_qs
+
+
+# On-disk cache directory shared by every run
+CACHE_DIR = os.path.expanduser('~/.cache/playlist_grabber')
+DB_PATH = os.path.join(CACHE_DIR, 'urls.db')
+
+# Googlevideo URLs expire after ~6 hours; used when the URL has no expire= parameter
+DEFAULT_TTL = 6 * 3600
+
+# Cached URLs closer than this to expiry are treated as misses
+MIN_REMAINING = 30 * 60
+
+# Expired rows are also purged after this many puts on one connection, since
+# long-running callers (the webapp's resolver threads) keep theirs open for good
+PURGE_EVERY = 1000
+
+_local = threading.local()
+
+
+def _purge_expired(conn: sqlite3.Connection) -> None:
+    """Delete rows whose URLs have already expired."""
+    with conn:
+        conn.execute('DELETE FROM urls WHERE expires_at < ?', (time.time(),))
+
+
+def _connect() -> sqlite3.Connection:
+    """Get this thread's connection, creating the database and purging expired rows on first use."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS urls ('
+            'video_id TEXT NOT NULL, '
+            'quality TEXT NOT NULL, '
+            'url TEXT NOT NULL, '
+            'format_info TEXT, '
+            'expires_at REAL NOT NULL, '
+            'PRIMARY KEY (video_id, quality))'
+        )
+        _purge_expired(conn)
+        _local.conn = conn
+        _local.puts = 0
+    return conn
+
+
+def expiry_from_url(url: str) -> float:
+    """
+    Get the expiry timestamp of a googlevideo URL from its expire= parameter.
+
+    Args:
+        url: Direct download URL
+
+    Returns:
+        Unix timestamp at which the URL stops working
+    """
+    try:
+        return float(parse_qs(urlparse(url).query)['expire'][0])
+    except (KeyError, IndexError, ValueError):
+        return time.time() + DEFAULT_TTL
+
+
+def get(video_id: str, quality: str) -> Optional[Tuple[str, Optional[Dict]]]:
+    """
+    Look up a cached direct URL.
+
+    Args:
+        video_id: YouTube video ID
+        quality: Quality preference the URL was resolved for
+
+    Returns:
+        Tuple of (direct_url, format_info), or None on miss or expiry
+    """
+    try:
+        row = _connect().execute(
+            'SELECT url, format_info FROM urls WHERE video_id = ? AND quality = ? AND expires_at > ?',
+            (video_id, quality, time.time() + MIN_REMAINING)
+        ).fetchone()
+    except (sqlite3.Error, OSError):
+        return None
+
+    if not row:
+        return None
+
+    url, format_info = row
+    return url, json.loads(format_info) if format_info else None
+
+
+def put(video_id: str, quality: str, url: str, format_info: Optional[Dict], expires_at: float) -> None:
+    """
+    Store a resolved direct URL.
+
+    Args:
+        video_id: YouTube video ID
+        quality: Quality preference the URL was resolved for
+        url: Direct download URL
+        format_info: Format details returned alongside the URL
+        expires_at: Unix timestamp at which the URL stops working
+    """
+    try:
+        conn = _connect()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO urls (video_id, quality, url, format_info, expires_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (video_id, quality, url, json.dumps(format_info) if format_info else None, expires_at)
+            )
+        
+        _local.puts += 1
+        if _local.puts >= PURGE_EVERY:
+            _local.puts = 0
+            _purge_expired(conn)
+    except (sqlite3.Error, OSError):
+        # The cache is an optimization; never fail a resolution over it
+        # (OSError covers an unwritable cache directory)
+        pass
@@ -3,78 +3,261 @@ URL Resolver Module
 Resolves direct download URLs for YouTube videos using yt-dlp
 """
 
+import math
+import threading
 import yt_dlp
-from typing import Optional, Dict, Tuple
+from typing import Optional, Dict, List, Tuple
 
+from modules import url_cache
 
-def get_direct_url(video_id: str, quality_preference: str = 'best') -> Tuple[Optional[str], Optional[Dict]]:
+
+# Units used by format_filesize
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# Error message fragments for throttling; checked first because YouTube's
+# rate-limit message also starts with "Video unavailable"
+TRANSIENT_ERROR_MARKERS = (
+    'try again later',
+    'rate-limit',
+    'rate limit',
+    'http error 429',
+    'too many requests',
+)
+
+# Error message fragments for videos that will never resolve, however often we retry
+PERMANENT_ERROR_MARKERS = (
+    'private video',
+    'video unavailable',
+    'this video is unavailable',
+    'has been removed',
+    'account associated with this video has been terminated',
+    'copyright',
+    'age-restricted',
+    'confirm your age',
+    'inappropriate for some users',
+    'members-only',
+    'join this channel',
+    'premieres in',
+    'live event will begin',
+    'requested format is not available',  # Same selector, same result on every retry
+)
+
+# Format selection based on quality preference
+FORMAT_SELECTORS = {
+    '1080p': 'bestvideo[height<=1080][ext=mp4]+bestaudio[ext=m4a]/best[height<=1080][ext=mp4]/best[ext=mp4]/best',
+    '720p': 'bestvideo[height<=720][ext=mp4]+bestaudio[ext=m4a]/best[height<=720][ext=mp4]/best[ext=mp4]/best',
+    'best': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best'
+}
+
+
+def build_ydl_opts(quality_preference: str = 'best') -> Dict:
+    """
+    Build yt-dlp options for resolving direct URLs at the given quality.
+    
+    Args:
+        quality_preference: Quality preference ('1080p', '720p', 'best')
+        
+    Returns:
+        Options dictionary for yt_dlp.YoutubeDL
+    """
+    return {
+        'quiet': True,
+        'no_warnings': True,
+        'format': FORMAT_SELECTORS.get(quality_preference, FORMAT_SELECTORS['best']),
+        'ignoreerrors': False,  # Raise so failures can be classified
+        'cachedir': url_cache.CACHE_DIR,  # Player JS and signature functions
+        'http_headers': {'Connection': 'keep-alive'},
+    }
+
+
+# Per-thread YoutubeDL instances, one per quality preference. YoutubeDL keeps
+# mutable per-instance state, so threads never share one; the on-disk cachedir
+# still lets every instance reuse the downloaded player JS.
+_THREAD_YDL = threading.local()
+
+
+def create_ydl(quality_preference: str = 'best') -> yt_dlp.YoutubeDL:
+    """
+    Create a YoutubeDL instance that can be reused across many videos.
+    
+    Reusing one instance lets yt-dlp keep its player JS and extractor
+    state between videos instead of rebuilding them for every call.
+    
+    Args:
+        quality_preference: Quality preference ('1080p', '720p', 'best')
+        
+    Returns:
+        Configured yt_dlp.YoutubeDL instance
+    """
+    return yt_dlp.YoutubeDL(build_ydl_opts(quality_preference))
+
+
+def get_thread_ydl(quality_preference: str = 'best') -> yt_dlp.YoutubeDL:
+    """
+    Get the calling thread's YoutubeDL instance for a quality preference.
+    
+    The instance is created on the thread's first call and kept alive, so
+    its HTTP connections and player JS are reused by every later call made
+    from that thread, without any locking.
+    
+    Args:
+        quality_preference: Quality preference ('1080p', '720p', 'best')
+        
+    Returns:
+        This thread's yt_dlp.YoutubeDL instance
+    """
+    instances = getattr(_THREAD_YDL, 'instances', None)
+    if instances is None:
+        instances = _THREAD_YDL.instances = {}
+    
+    ydl = instances.get(quality_preference)
+    if ydl is None:
+        ydl = instances[quality_preference] = create_ydl(quality_preference)
+    return ydl
+
+
+def extract_direct_url(info: Optional[Dict]) -> Tuple[Optional[str], Optional[Dict]]:
+    """
+    Pull the direct URL and format details out of a resolved yt-dlp info dict.
+    
+    Args:
+        info: Info dictionary returned by extract_info with formats selected
+        
+    Returns:
+        Tuple of (direct_url, format_info) or (None, None) if unavailable
+    """
+    if not info:
+        return None, None
+    
+    # Get the direct URL
+    # For merged formats, yt-dlp provides the URL in 'url' field
+    # For single formats, it's also in 'url'
+    direct_url = info.get('url')
+    
+    # If url is not directly available, try to get it from requested_formats
+    if not direct_url and 'requested_formats' in info:
+        # For merged video+audio, we want the video URL
+        # IDM can handle the video part
+        video_format = info['requested_formats'][0]
+        direct_url = video_format.get('url')
+    
+    # Build format info
+    format_info = {
+        'resolution': f"{info.get('width', 'N/A')}x{info.get('height', 'N/A')}",
+        'filesize': info.get('filesize') or info.get('filesize_approx', 0),
+        'ext': info.get('ext', 'mp4'),
+        'format_note': info.get('format_note', 'unknown'),
+        'vcodec': info.get('vcodec', 'unknown'),
+        'acodec': info.get('acodec', 'unknown')
+    }
+    
+    return direct_url, format_info
+
+
+def classify_error(error: Exception) -> str:
+    """
+    Classify a resolution failure as 'permanent' or 'transient'.
+    
+    Private, deleted, age-restricted and members-only videos are permanent;
+    everything else (rate limiting, network errors) is worth retrying.
+    Rate-limit messages are transient even when they also match a
+    permanent marker.
+    
+    Args:
+        error: Exception raised while extracting the video
+        
+    Returns:
+        'permanent' or 'transient'
+    """
+    if isinstance(error, yt_dlp.utils.DownloadError):
+        message = str(error.msg or error).lower()
+        if any(marker in message for marker in TRANSIENT_ERROR_MARKERS):
+            return 'transient'
+        if any(marker in message for marker in PERMANENT_ERROR_MARKERS):
+            return 'permanent'
+    
+    return 'transient'
+
+
+def get_direct_url(
+    video_id: str,
+    quality_preference: str = 'best',
+    ydl: Optional[yt_dlp.YoutubeDL] = None
+) -> Tuple[Optional[str], Optional[Dict], Optional[str]]:
     """
     Resolve direct download URL for a YouTube video.
     
     Args:
         video_id: YouTube video ID
         quality_preference: Quality preference ('1080p', '720p', 'best')
+        ydl: YoutubeDL instance to use (defaults to get_thread_ydl)
         
     Returns:
-        Tuple of (direct_url, format_info) or (None, None) if failed
+        Tuple of (direct_url, format_info, error_class)
+        On success error_class is None; on failure it is (None, None, error_class)
+        with error_class 'permanent' (don't retry) or 'transient' (retry)
         format_info contains: resolution, filesize, ext, format_note
         
     Note:
-        Direct URLs expire after several hours and must be used promptly
+        Direct URLs expire after several hours and must be used promptly.
+        Resolved URLs are cached on disk until shortly before they expire.
     """
-    video_url = f"https://www.youtube.com/watch?v={video_id}"
+    cached = url_cache.get(video_id, quality_preference)
+    if cached:
+        return cached[0], cached[1], None
     
-    # Define format selection based on quality preference
-    format_selectors = {
-        '1080p': 'bestvideo[height<=1080][ext=mp4]+bestaudio[ext=m4a]/best[height<=1080][ext=mp4]/best[ext=mp4]/best',
-        '720p': 'bestvideo[height<=720][ext=mp4]+bestaudio[ext=m4a]/best[height<=720][ext=mp4]/best[ext=mp4]/best',
-        'best': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best'
-    }
+    video_url = f"https://www.youtube.com/watch?v={video_id}"
     
-    format_string = format_selectors.get(quality_preference, format_selectors['best'])
-    
-    ydl_opts = {
-        'quiet': True,
-        'no_warnings': True,
-        'format': format_string,
-        'ignoreerrors': True,
-    }
+    if ydl is None:
+        ydl = get_thread_ydl(quality_preference)
     
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            # Extract video info without downloading
-            info = ydl.extract_info(video_url, download=False)
-            
-            if not info:
-                return None, None
-            
-            # Get the direct URL
-            # For merged formats, yt-dlp provides the URL in 'url' field
-            # For single formats, it's also in 'url'
-            direct_url = info.get('url')
-            
-            # If url is not directly available, try to get it from requested_formats
-            if not direct_url and 'requested_formats' in info:
-                # For merged video+audio, we want the video URL
-                # IDM can handle the video part
-                video_format = info['requested_formats'][0]
-                direct_url = video_format.get('url')
-            
-            # Build format info
-            format_info = {
-                'resolution': f"{info.get('width', 'N/A')}x{info.get('height', 'N/A')}",
-                'filesize': info.get('filesize') or info.get('filesize_approx', 0),
-                'ext': info.get('ext', 'mp4'),
-                'format_note': info.get('format_note', 'unknown'),
-                'vcodec': info.get('vcodec', 'unknown'),
-                'acodec': info.get('acodec', 'unknown')
-            }
-            
-            return direct_url, format_info
+        # Extract video info without downloading
+        info = ydl.extract_info(video_url, download=False)
+        
+        if not info:
+            return None, None, 'transient'
+        
+        direct_url, format_info = extract_direct_url(info)
+        
+        if not direct_url:
+            # Extraction succeeded but no format has a usable URL
+            return None, None, 'permanent'
+        
+        url_cache.put(video_id, quality_preference, direct_url, format_info,
+                      url_cache.expiry_from_url(direct_url))
+        
+        return direct_url, format_info, None
             
     except Exception as e:
         # Return None for failed videos (private, deleted, age-restricted, etc.)
-        return None, None
+        return None, None, classify_error(e)
+
+
+def get_direct_url_batch(
+    video_ids: List[str],
+    quality_preference: str = 'best',
+    ydl: Optional[yt_dlp.YoutubeDL] = None
+) -> List[Tuple[Optional[str], Optional[Dict], Optional[str]]]:
+    """
+    Resolve several videos in turn through one YoutubeDL instance.
+    
+    By default that is the calling thread's own instance, so batches
+    running on different threads never share a YoutubeDL.
+    
+    Args:
+        video_ids: YouTube video IDs
+        quality_preference: Quality preference ('1080p', '720p', 'best')
+        ydl: YoutubeDL instance to use (defaults to get_thread_ydl)
+        
+    Returns:
+        List of (direct_url, format_info, error_class) tuples, as returned by
+        get_direct_url, in the same order as video_ids
+    """
+    if ydl is None:
+        ydl = get_thread_ydl(quality_preference)
+    
+    return [get_direct_url(video_id, quality_preference, ydl) for video_id in video_ids]
 
 
 def format_filesize(size_bytes: int) -> str:
@@ -87,12 +270,10 @@ def format_filesize(size_bytes: int) -> str:
     Returns:
         Formatted string (e.g., "45.2 MB")
     """
-    if size_bytes == 0:
+    if not size_bytes or size_bytes <= 0:
         return "Unknown"
     
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024.0
+    # Each unit is 2**10 times the previous one, so the bit length picks it directly
+    unit_idx = min(max(int(math.log2(size_bytes)) // 10, 0), len(_SIZE_UNITS) - 1)
     
-    return f"{size_bytes:.1f} TB"
+    return f"{size_bytes / (1 << (10 * unit_idx)):.1f} {_SIZE_UNITS[unit_idx]}"
@@ -0,0 +1,78 @@
+"""
+Async URL Resolver Module
+Resolves direct download URLs straight from YouTube's InnerTube player API using aiohttp
+"""
+
+import asyncio
+import contextlib
+import aiohttp
+from typing import Optional, Dict, List, Tuple
+
+from modules.innertube import (
+    PLAYER_ENDPOINT, REQUEST_HEADERS, REQUEST_TIMEOUT, build_player_request, parse_player_response
+)
+
+
+async def get_direct_url_async(
+    session: aiohttp.ClientSession,
+    video_id: str,
+    quality_preference: str = 'best',
+    sem: Optional[asyncio.Semaphore] = None
+) -> Tuple[Optional[str], Optional[Dict], Optional[str]]:
+    """
+    Resolve direct download URL for a YouTube video via the InnerTube player API.
+
+    Args:
+        session: Shared aiohttp session (keeps connections alive between videos);
+                 its timeout should be innertube.REQUEST_TIMEOUT
+        video_id: YouTube video ID
+        quality_preference: Quality preference ('1080p', '720p', 'best')
+        sem: Optional semaphore bounding the number of requests in flight
+
+    Returns:
+        Tuple of (direct_url, format_info, error_class), as returned by
+        url_resolver.get_direct_url. Videos InnerTube won't serve directly
+        (ciphered, login required) fail and should be retried through yt-dlp.
+    """
+    try:
+        async with sem or contextlib.nullcontext():
+            async with session.post(
+                PLAYER_ENDPOINT,
+                json=build_player_request(video_id),
+                headers=REQUEST_HEADERS
+            ) as response:
+                if response.status != 200:
+                    return None, None, 'transient'
+                data = await response.json()
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return None, None, 'transient'
+
+    return parse_player_response(data, quality_preference)
+
+
+async def get_direct_urls_async(
+    video_ids: List[str],
+    quality_preference: str = 'best',
+    max_workers: int = 10
+) -> List[Tuple[Optional[str], Optional[Dict], Optional[str]]]:
+    """
+    Resolve many videos concurrently over one pooled aiohttp session.
+
+    Args:
+        video_ids: YouTube video IDs
+        quality_preference: Quality preference ('1080p', '720p', 'best')
+        max_workers: Maximum number of requests in flight
+
+    Returns:
+        List of (direct_url, format_info, error_class) tuples in the same order as video_ids
+    """
+    sem = asyncio.Semaphore(max_workers)
+    connector = aiohttp.TCPConnector(limit=max_workers)
+
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        return await asyncio.gather(*[
+            get_direct_url_async(session, video_id, quality_preference, sem)
+            for video_id in video_ids
+        ])
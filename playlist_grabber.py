@@ -13,9 +13,14 @@ Example:
 """
 
 import argparse
+import re
 import sys
 
 
+# Validates a playlist URL and captures its playlist ID in one pass
+_PLAYLIST_RE = re.compile(r'^https?://[^\s]+[?&]list=([A-Za-z0-9_-]+)')
+
+
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(
@@ -38,6 +43,10 @@ Performance Modes:
   Sequential (default) - Processes videos one at a time
   Async (--async)      - Processes multiple videos concurrently (10-15x faster!)
                         Use --workers to control concurrency (default: 10, max: 20)
+                        Add --innertube to skip yt-dlp for videos YouTube's
+                        player API serves directly
+                        Add --processes to parse yt-dlp responses on every
+                        CPU core instead of in threads
 
 Notes:
   - Generated URLs expire after several hours
@@ -98,6 +107,20 @@ Notes:
         help='Number of concurrent workers in async mode (default: 10, max recommended: 20)'
     )
     
+    parser.add_argument(
+        '--innertube',
+        dest='use_innertube',
+        action='store_true',
+        help='Query YouTube\'s InnerTube player API directly, falling back to yt-dlp'
+    )
+    
+    parser.add_argument(
+        '--processes',
+        dest='use_processes',
+        action='store_true',
+        help='Async mode only: resolve in worker processes instead of threads (uses every CPU core for yt-dlp parsing)'
+    )
+    
     parser.add_argument(
         '-v', '--version',
         action='version',
@@ -106,14 +129,13 @@ Notes:
     
     args = parser.parse_args()
     
-    # Validate playlist URL
-    if not args.playlist_url.startswith('http'):
-        print("Error: Please provide a valid YouTube playlist URL")
+    # Validate playlist URL and extract the playlist ID
+    match = _PLAYLIST_RE.match(args.playlist_url)
+    if not match:
+        print("Error: Please provide a valid YouTube playlist URL (with a 'list=' parameter)")
         sys.exit(1)
     
-    if 'list=' not in args.playlist_url:
-        print("Error: URL does not appear to be a playlist (missing 'list=' parameter)")
-        sys.exit(1)
+    playlist_id = match.group(1)
     
     # Validate delay
     if args.delay < 0.5:
@@ -129,33 +151,25 @@ Notes:
         print("Warning: More than 20 workers may trigger YouTube rate limiting. Setting to 20.")
         args.workers = 20
     
-    # Import appropriate orchestrator based on mode
+    from modules.orchestrator import process_playlist
+    
     if args.use_async:
-        from modules.orchestrator_async import process_playlist
         print(f"\n🚀 ASYNC MODE ENABLED: Processing with {args.workers} concurrent workers")
         print("⚡ Expected speedup: 10-15x faster than sequential mode!\n")
-    else:
-        from modules.orchestrator import process_playlist
     
-    # Process playlist
+    # Process playlist (a single worker means sequential processing)
     try:
-        if args.use_async:
-            result = process_playlist(
-                playlist_url=args.playlist_url,
-                output_path=args.output_file,
-                quality=args.quality,
-                delay=args.delay,
-                max_retries=args.retries,
-                max_workers=args.workers
-            )
-        else:
-            result = process_playlist(
-                playlist_url=args.playlist_url,
-                output_path=args.output_file,
-                quality=args.quality,
-                delay=args.delay,
-                max_retries=args.retries
-            )
+        result = process_playlist(
+            playlist_url=args.playlist_url,
+            playlist_id=playlist_id,
+            output_path=args.output_file,
+            quality=args.quality,
+            delay=args.delay,
+            max_retries=args.retries,
+            max_workers=args.workers if args.use_async else 1,
+            use_innertube=args.use_innertube,
+            use_processes=args.use_processes
+        )
         
         # Exit with appropriate code
         if result['success']:
@@ -5,24 +5,34 @@ Optimized for Render.com deployment with no timeout limits
 
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from cachetools import TLRUCache, TTLCache
+import anyio
 import os
+import re
 import sys
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import aiohttp
+import threading
 import time
 import uuid
 
 # Add parent directory to path to import modules
 sys.path.append(str(Path(__file__).parent.parent))
 
-from modules.playlist_fetcher import get_playlist_videos, get_playlist_title
-from modules.url_resolver import get_direct_url, format_filesize
+from modules import url_cache
+from modules.playlist_fetcher import get_playlist_info
+from modules.url_resolver import get_direct_url_batch, format_filesize
+from modules.url_resolver_async import get_direct_url_async
+from modules.innertube import REQUEST_TIMEOUT
 
-app = FastAPI(title="YouTube Playlist Extractor")
+app = FastAPI(title="YouTube Playlist Extractor", default_response_class=ORJSONResponse)
 
 # CORS middleware for development
 app.add_middleware(
@@ -33,10 +43,99 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress playlist JSON and generated URL files (highly repetitive text)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
+# Worker threads available to sync endpoints (Starlette's default is 40)
+THREADPOOL_SIZE = 200
+
+@app.on_event("startup")
+async def configure_threadpool():
+    """Let many blocking playlist fetches run at once"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
 # Create temp directory for generated files
 TEMP_DIR = Path(__file__).parent / "temp"
 TEMP_DIR.mkdir(exist_ok=True)
 
+# Entries of the generated file included in the generate-urls response
+PREVIEW_ENTRIES = 3
+
+# Generated files are useless once their URLs expire
+TEMP_FILE_MAX_AGE = 6 * 3600
+TEMP_CLEANUP_INTERVAL = 600
+
+# Maximum URL resolutions in flight per request
+MAX_CONCURRENT_RESOLVES = 64
+# Videos resolved in turn by each yt-dlp worker thread
+YTDLP_BATCH_SIZE = 8
+
+# Long-lived pool for yt-dlp resolutions, shared by every request. Each of its
+# threads keeps its own YoutubeDL (url_resolver.get_thread_ydl) across batches
+EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="resolve")
+
+# Playlist metadata rarely changes, so repeat fetches are served from memory (keyed by playlist ID)
+_PLAYLIST_CACHE = TTLCache(maxsize=2000, ttl=600)
+_PLAYLIST_CACHE_LOCK = threading.Lock()
+# Per-playlist locks so concurrent fetches of one playlist share a single scrape
+_PLAYLIST_FETCH_LOCKS: Dict[str, threading.Lock] = {}
+
+# Direct URLs are reused for up to an hour, but never past the point where the
+# SQLite cache would stop serving them (url_cache.MIN_REMAINING before expire=)
+URL_CACHE_TTL = 3600
+
+def _url_time_to_use(key: Tuple[str, str], value: Tuple[str, Optional[Dict]], now: float) -> float:
+    """Expiry time for a cached (direct_url, format_info) entry"""
+    return min(now + URL_CACHE_TTL, url_cache.expiry_from_url(value[0]) - url_cache.MIN_REMAINING)
+
+_URL_CACHE = TLRUCache(maxsize=10_000, ttu=_url_time_to_use, timer=time.time)
+# Resolutions in progress, so concurrent requests for one key share one lookup
+_URL_INFLIGHT: Dict[Tuple[str, str], asyncio.Future] = {}
+
+def remove_expired_files() -> None:
+    """Delete generated files older than TEMP_FILE_MAX_AGE"""
+    now = time.time()
+    for path in TEMP_DIR.iterdir():
+        try:
+            if now - path.stat().st_mtime > TEMP_FILE_MAX_AGE:
+                path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+async def _cleanup_loop():
+    """Sweep expired files from TEMP_DIR periodically"""
+    while True:
+        await asyncio.sleep(TEMP_CLEANUP_INTERVAL)
+        await asyncio.to_thread(remove_expired_files)
+
+@app.on_event("startup")
+async def start_cleanup():
+    """Start the temp file sweeper"""
+    app.state.cleanup_task = asyncio.create_task(_cleanup_loop())
+
+@app.on_event("shutdown")
+async def stop_cleanup():
+    """Stop the temp file sweeper"""
+    app.state.cleanup_task.cancel()
+
+@app.on_event("startup")
+async def open_http_session():
+    """Open the keep-alive session shared by every InnerTube request"""
+    app.state.http = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=60),
+        timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    )
+
+@app.on_event("shutdown")
+async def close_http_session():
+    """Close the shared HTTP session"""
+    await app.state.http.close()
+
+@app.on_event("shutdown")
+def stop_executor():
+    """Release the resolver threads"""
+    EXECUTOR.shutdown(wait=False, cancel_futures=True)
+
 # Pydantic models
 class PlaylistRequest(BaseModel):
     url: str
@@ -45,6 +144,9 @@ class PlaylistRequest(BaseModel):
 class GenerateURLsRequest(BaseModel):
     videos: List[Dict[str, str]]  # [{"id": "...", "title": "...", "quality": "..."}]
 
+class CacheInvalidateRequest(BaseModel):
+    url: Optional[str] = None  # Omit to clear every cached playlist
+
 class VideoInfo(BaseModel):
     id: str
     title: str
@@ -56,22 +158,160 @@ class PlaylistResponse(BaseModel):
     total_videos: int
     videos: List[VideoInfo]
 
+# Static header of every generated file, formatted with the timestamp and count
+_HR = "=" * 80 + "\n"
+_FILE_HEADER_TEMPLATE = (
+    f"{_HR}YouTube Playlist Direct Download URLs\n{_HR}"
+    + "Generated: {ts}\nTotal Videos: {n}\n"
+    + f"{_HR}\n"
+    + "IMPORTANT NOTES:\n"
+    + "- These URLs expire after several hours. Use them promptly.\n"
+    + "- Import this file into Internet Download Manager (IDM).\n"
+    + "- Video titles are included in URLs for auto-naming.\n"
+    + f"\n{_HR}\n"
+)
+
+# Cheap input checks that reject malformed requests before any YouTube traffic
+_YT_PLAYLIST_RE = re.compile(r'^https?://(?:www\.|m\.)?(?:youtube\.com|youtu\.be)/\S*[?&]list=([A-Za-z0-9_-]{10,})')
+_VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
 # Helper function to sanitize filename
+_SANITIZE_TABLE = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
 def sanitize_filename(filename: str) -> str:
     """Remove invalid characters from filename"""
-    invalid_chars = '<>:"/\\|?*'
-    for char in invalid_chars:
-        filename = filename.replace(char, '_')
-    return filename.strip('. ')[:200]
-
-# Helper function to resolve single video URL
-def resolve_video_url(video_data: Dict[str, str]) -> Dict:
-    """Resolve direct URL for a single video"""
-    video_id = video_data['id']
-    video_title = video_data['title']
-    quality = video_data.get('quality', 'best')
+    return filename.translate(_SANITIZE_TABLE).strip('. ')[:200]
+
+# Helper function to fetch playlist metadata through the cache
+def get_cached_playlist(playlist_id: str, playlist_url: str) -> tuple:
+    """
+    Return (playlist_title, videos), scraping YouTube only on a cache miss
+    Keyed by playlist ID, so URL variants of one playlist share an entry;
+    a miss fetches the user's own URL (Mix lists only extract from watch pages)
+    """
+    with _PLAYLIST_CACHE_LOCK:
+        cached = _PLAYLIST_CACHE.get(playlist_id)
+        if cached is not None:
+            return cached
+        fetch_lock = _PLAYLIST_FETCH_LOCKS.setdefault(playlist_id, threading.Lock())
     
-    direct_url, format_info = get_direct_url(video_id, quality)
+    with fetch_lock:
+        # Another request may have finished the scrape while we waited
+        with _PLAYLIST_CACHE_LOCK:
+            cached = _PLAYLIST_CACHE.get(playlist_id)
+            if cached is not None:
+                return cached
+        
+        try:
+            playlist_info = get_playlist_info(playlist_url, playlist_id=playlist_id)
+            result = (playlist_info['title'], playlist_info['videos'])
+            with _PLAYLIST_CACHE_LOCK:
+                _PLAYLIST_CACHE[playlist_id] = result
+            return result
+        finally:
+            # Only remove our own lock; a newer request may have replaced it
+            with _PLAYLIST_CACHE_LOCK:
+                if _PLAYLIST_FETCH_LOCKS.get(playlist_id) is fetch_lock:
+                    del _PLAYLIST_FETCH_LOCKS[playlist_id]
+
+# Helper function to resolve single video URL through InnerTube
+async def resolve_video_url_async(video_id: str, quality: str, session: aiohttp.ClientSession,
+                                  sem: asyncio.Semaphore) -> Tuple[Optional[str], Optional[Dict]]:
+    """Resolve direct URL for a single video via the InnerTube player API"""
+    async with sem:
+        direct_url, format_info, _ = await get_direct_url_async(session, video_id, quality)
+    return direct_url, format_info
+
+# Helper function to resolve direct URLs for many videos
+async def resolve_direct_urls(keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Tuple[str, Optional[Dict]]]:
+    """
+    Resolve (video_id, quality) keys to (direct_url, format_info)
+    Keys another request is already resolving are awaited, not looked up twice
+    Keys that fail to resolve are missing from the result
+    """
+    resolved = {}
+    pending = []
+    waiting = {}
+    for key in keys:
+        cached = _URL_CACHE.get(key)
+        if cached is not None:
+            resolved[key] = cached
+        elif key in _URL_INFLIGHT:
+            waiting[key] = _URL_INFLIGHT[key]
+        else:
+            pending.append(key)
+    
+    loop = asyncio.get_running_loop()
+    for key in pending:
+        _URL_INFLIGHT[key] = loop.create_future()
+    
+    try:
+        await _resolve_pending(pending, resolved)
+    finally:
+        # Wake up every request waiting on these keys, even if resolution failed
+        for key in pending:
+            future = _URL_INFLIGHT.pop(key)
+            if not future.done():
+                future.set_result(resolved.get(key))
+    
+    # Pick up keys another request was already resolving; shielded so that
+    # cancelling this request doesn't cancel the lookup other requests share
+    for key, future in waiting.items():
+        result = await asyncio.shield(future)
+        if result is not None:
+            resolved[key] = result
+    
+    return resolved
+
+async def _resolve_pending(pending: List[Tuple[str, str]], resolved: Dict) -> None:
+    """
+    Resolve uncached keys into resolved, caching every success
+    InnerTube is tried for every key concurrently; only the keys it can't
+    serve go through yt-dlp, in batches run on the resolver threads' own YoutubeDLs
+    """
+    # Ask InnerTube directly first, over the app-wide keep-alive session
+    sem = asyncio.Semaphore(MAX_CONCURRENT_RESOLVES)
+    results = await asyncio.gather(
+        *[resolve_video_url_async(video_id, quality, app.state.http, sem) for video_id, quality in pending],
+        return_exceptions=True
+    )
+    
+    fallback: Dict[str, List[str]] = {}
+    for key, result in zip(pending, results):
+        if isinstance(result, tuple) and result[0]:
+            resolved[key] = result
+        else:
+            fallback.setdefault(key[1], []).append(key[0])
+    
+    # Resolve the rest through yt-dlp, one worker thread per batch
+    batches = [
+        (quality, video_ids[i:i + YTDLP_BATCH_SIZE])
+        for quality, video_ids in fallback.items()
+        for i in range(0, len(video_ids), YTDLP_BATCH_SIZE)
+    ]
+    loop = asyncio.get_running_loop()
+    batch_results = await asyncio.gather(
+        *[loop.run_in_executor(EXECUTOR, get_direct_url_batch, video_ids, quality)
+          for quality, video_ids in batches],
+        return_exceptions=True
+    )
+    
+    for (quality, video_ids), batch in zip(batches, batch_results):
+        if isinstance(batch, BaseException):
+            continue
+        for video_id, (direct_url, format_info, _) in zip(video_ids, batch):
+            if direct_url:
+                resolved[(video_id, quality)] = (direct_url, format_info)
+    
+    for key in pending:
+        if key in resolved:
+            _URL_CACHE[key] = resolved[key]
+
+# Helper function to build the result entry for a video
+def build_video_result(video_data: Dict[str, str], direct_url: Optional[str],
+                       format_info: Optional[Dict]) -> Dict:
+    """Build the success or failure entry for a single video"""
+    video_title = video_data['title']
     
     if direct_url:
         # Add video title as URL fragment for IDM auto-naming
@@ -82,7 +322,7 @@ def resolve_video_url(video_data: Dict[str, str]) -> Dict:
             'success': True,
             'title': video_title,
             'url': url_with_title,
-            'quality': quality,
+            'quality': video_data.get('quality', 'best'),
             'format_info': format_info
         }
     else:
@@ -92,39 +332,66 @@ def resolve_video_url(video_data: Dict[str, str]) -> Dict:
             'error': 'Failed to resolve URL'
         }
 
+# Helper function to write the generated URL file
+def write_url_file(file_path: Path, videos: List[Dict]) -> str:
+    """
+    Write the IDM import file one entry at a time
+    Returns the header plus the first PREVIEW_ENTRIES entries for the results panel
+    """
+    header = _FILE_HEADER_TEMPLATE.format(ts=time.strftime('%Y-%m-%d %H:%M:%S'), n=len(videos))
+    preview = [header]
+    
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(header)
+        
+        for idx, video in enumerate(videos, 1):
+            entry = f"# Video {idx}: {video['title']}\n"
+            if video.get('format_info'):
+                resolution = video['format_info'].get('resolution', 'N/A')
+                entry += f"# Resolution: {resolution} | Quality: {video['quality']}\n"
+            entry += f"{video['url']}\n\n"
+            
+            f.write(entry)
+            if idx <= PREVIEW_ENTRIES:
+                preview.append(entry)
+    
+    return "".join(preview)
+
 @app.get("/")
 async def read_root():
     """Serve the main HTML page"""
     return FileResponse("webapp/static/index.html")
 
 @app.post("/api/fetch-playlist", response_model=PlaylistResponse)
-async def fetch_playlist(request: PlaylistRequest):
+def fetch_playlist(request: PlaylistRequest):
     """
     Fetch playlist metadata without resolving URLs
     Fast operation - completes in seconds
+    Sync on purpose: yt-dlp blocks, so FastAPI runs this in its threadpool
     """
+    match = _YT_PLAYLIST_RE.match(request.url)
+    if not match:
+        raise HTTPException(status_code=400, detail="Invalid YouTube playlist URL")
+    
     try:
-        # Get playlist title
-        playlist_title = get_playlist_title(request.url)
-        
-        # Get video metadata
-        videos = get_playlist_videos(request.url)
+        # Get playlist title and video metadata in one extraction (cached)
+        playlist_title, videos = get_cached_playlist(match.group(1), request.url)
         
         if not videos:
             raise HTTPException(status_code=404, detail="No videos found in playlist")
         
-        # Format response
+        # Format response (trusted yt-dlp output, so skip per-row validation)
         video_list = [
-            VideoInfo(
+            VideoInfo.model_construct(
                 id=video['id'],
                 title=video['title'],
-                duration=video.get('duration', 0),
+                duration=video['duration'],
                 thumbnail=f"https://img.youtube.com/vi/{video['id']}/mqdefault.jpg"
             )
             for video in videos
         ]
         
-        return PlaylistResponse(
+        return PlaylistResponse.model_construct(
             title=playlist_title,
             total_videos=len(video_list),
             videos=video_list
@@ -133,64 +400,67 @@ async def fetch_playlist(request: PlaylistRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch playlist: {str(e)}")
 
+@app.post("/api/cache/invalidate")
+def invalidate_cache(request: CacheInvalidateRequest):
+    """
+    Drop cached playlist metadata so the next fetch re-scrapes YouTube
+    """
+    if request.url is not None:
+        match = _YT_PLAYLIST_RE.match(request.url)
+        if not match:
+            raise HTTPException(status_code=400, detail="Invalid YouTube playlist URL")
+    
+    with _PLAYLIST_CACHE_LOCK:
+        if request.url is None:
+            removed = len(_PLAYLIST_CACHE)
+            _PLAYLIST_CACHE.clear()
+        else:
+            removed = 1 if _PLAYLIST_CACHE.pop(match.group(1), None) is not None else 0
+    
+    return {'success': True, 'removed': removed}
+
 @app.post("/api/generate-urls")
 async def generate_urls(request: GenerateURLsRequest):
     """
     Generate direct URLs for selected videos
-    Uses concurrent processing for speed
+    Resolves every video concurrently on the event loop
     """
     try:
         if not request.videos:
             raise HTTPException(status_code=400, detail="No videos selected")
         
-        # Process videos concurrently (10 workers for speed)
-        results = []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(resolve_video_url, video) for video in request.videos]
-            results = [future.result() for future in futures]
+        # Resolve each distinct (video, quality) once, concurrently
+        # Malformed video IDs are never sent to YouTube and count as failed
+        keys = [(video['id'], video.get('quality', 'best')) for video in request.videos]
+        resolved = await resolve_direct_urls(
+            [key for key in dict.fromkeys(keys) if _VIDEO_ID_RE.match(key[0])]
+        )
+        
+        results = [
+            build_video_result(video, *resolved.get(key, (None, None)))
+            for video, key in zip(request.videos, keys)
+        ]
         
-        # Filter successful results
-        successful = [r for r in results if r['success']]
-        failed = [r for r in results if not r['success']]
+        # Split successful and failed results in one pass
+        successful, failed = [], []
+        for result in results:
+            (successful if result['success'] else failed).append(result)
         
         if not successful:
             raise HTTPException(status_code=500, detail="Failed to resolve any URLs")
         
-        # Generate text file content
-        file_content = "=" * 80 + "\n"
-        file_content += "YouTube Playlist Direct Download URLs\n"
-        file_content += "=" * 80 + "\n"
-        file_content += f"Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-        file_content += f"Total Videos: {len(successful)}\n"
-        file_content += "=" * 80 + "\n\n"
-        
-        file_content += "IMPORTANT NOTES:\n"
-        file_content += "- These URLs expire after several hours. Use them promptly.\n"
-        file_content += "- Import this file into Internet Download Manager (IDM).\n"
-        file_content += "- Video titles are included in URLs for auto-naming.\n\n"
-        file_content += "=" * 80 + "\n\n"
-        
-        for idx, video in enumerate(successful, 1):
-            file_content += f"# Video {idx}: {video['title']}\n"
-            if video.get('format_info'):
-                resolution = video['format_info'].get('resolution', 'N/A')
-                file_content += f"# Resolution: {resolution} | Quality: {video['quality']}\n"
-            file_content += f"{video['url']}\n\n"
-        
-        # Save to temporary file
+        # Stream the text file straight to disk
         file_id = str(uuid.uuid4())
         file_path = TEMP_DIR / f"{file_id}.txt"
+        preview = await asyncio.to_thread(write_url_file, file_path, successful)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(file_content)
-        
-        return JSONResponse({
+        return ORJSONResponse({
             'success': True,
             'file_id': file_id,
             'download_url': f"/download/{file_id}",
             'total_successful': len(successful),
             'total_failed': len(failed),
-            'content': file_content,  # For copy-to-clipboard
+            'preview': preview,  # Full content is served by /download/{file_id}?inline=1
             'failed_videos': [f['title'] for f in failed] if failed else []
         })
         
@@ -198,13 +468,16 @@ async def generate_urls(request: GenerateURLsRequest):
         raise HTTPException(status_code=500, detail=f"Failed to generate URLs: {str(e)}")
 
 @app.get("/download/{file_id}")
-async def download_file(file_id: str):
-    """Download generated .txt file"""
+async def download_file(file_id: str, inline: bool = False):
+    """Download generated .txt file (inline=1 returns it as plain text for copy-to-clipboard)"""
     file_path = TEMP_DIR / f"{file_id}.txt"
     
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="File not found or expired")
     
+    if inline:
+        return FileResponse(file_path, media_type="text/plain")
+    
     return FileResponse(
         file_path,
         media_type="text/plain",
@@ -221,4 +494,11 @@ app.mount("/static", StaticFiles(directory="webapp/static"), name="static")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop and httptools ship with uvicorn[standard]; uvloop has no Windows build
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
+    )
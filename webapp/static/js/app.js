@@ -243,8 +243,9 @@ generateBtn.addEventListener('click', async () => {
 });
 
 function displayResults(result) {
-    generatedContent = result.content;
     fileId = result.file_id;
+    // Full content is fetched only when the user copies it
+    generatedContent = null;
 
     totalVideos.textContent = result.total_successful + result.total_failed;
     successCount.textContent = result.total_successful;
@@ -256,20 +257,8 @@ function displayResults(result) {
         failedStat.style.display = 'none';
     }
 
-    // Show preview (first 3 URLs)
-    const lines = result.content.split('\n');
-    const previewLines = [];
-    let urlCount = 0;
-
-    for (const line of lines) {
-        previewLines.push(line);
-        if (line.startsWith('http')) {
-            urlCount++;
-            if (urlCount >= 3) break;
-        }
-    }
-
-    previewContent.textContent = previewLines.join('\n') + '\n\n... and more';
+    // Show preview (first 3 URLs, sent with the result)
+    previewContent.textContent = result.preview.trimEnd() + '\n\n... and more';
 
     downloadSection.style.display = 'block';
     progressBar.style.display = 'none';
@@ -278,9 +267,27 @@ function displayResults(result) {
     downloadSection.scrollIntoView({ behavior: 'smooth', block: 'start' });
 }
 
+async function fetchGeneratedContent() {
+    const response = await fetch(`/download/${fileId}?inline=1`);
+    if (!response.ok) {
+        throw new Error('Failed to load generated file');
+    }
+    generatedContent = await response.text();
+    return generatedContent;
+}
+
 copyBtn.addEventListener('click', async () => {
     try {
-        await navigator.clipboard.writeText(generatedContent);
+        if (generatedContent !== null) {
+            await navigator.clipboard.writeText(generatedContent);
+        } else if (window.ClipboardItem) {
+            // Hand the pending fetch to the clipboard so the write still counts
+            // as part of this click (Safari rejects writes after an await)
+            const blob = fetchGeneratedContent().then(text => new Blob([text], { type: 'text/plain' }));
+            await navigator.clipboard.write([new ClipboardItem({ 'text/plain': blob })]);
+        } else {
+            await navigator.clipboard.writeText(await fetchGeneratedContent());
+        }
         copySuccess.style.display = 'block';
         copyBtn.textContent = '✅ Copied!';
 